@@ -5,76 +5,295 @@ Monitor de Executive Orders (EO) de la Casa Blanca.
 - Scrapea la lista de EO y detecta novedades.
 - (Opcional) Cruza con Federal Register por título.
 - Notifica por consola y/o via webhook POST.
-Requisitos: requests, beautifulsoup4
-Opcional: feedparser (si prefieres usar RSS en vez de HTML)
+Requisitos: requests, beautifulsoup4, lxml, aiohttp (solo si hay webhooks)
+Opcional: feedparser (si prefieres usar RSS en vez de HTML), orjson
 
 Env vars:
   WEBHOOK_URL         -> opcional (Slack/Discord/etc.)
+  WEBHOOK_URLS        -> opcional, varios webhooks separados por coma
   STATE_PATH          -> opcional (default: .eo_state.json)
   FR_CHECK            -> "1" para cruzar con Federal Register (default: "1")
   MAX_ITEMS           -> opcional, cuántos items leer (default: 20)
+  HTML_ESCAPE         -> "1" para escapar HTML en los títulos (default: "0")
 
 Uso local:
-  pip install requests beautifulsoup4
+  pip install requests beautifulsoup4 lxml aiohttp
   python watch_eo.py
 """
 
+import asyncio
+import copy
 import json
 import os
 import re
 import sys
-import time
 import html
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 
-WHITEHOUSE_EO_URL = "https://www.whitehouse.gov/presidential-actions/executive-orders/"
-WHITEHOUSE_PR_URL = "https://www.whitehouse.gov/presidential-actions/proclamations/"
+try:
+    import orjson  # opcional: (de)serialización del estado más rápida
+except ImportError:
+    orjson = None
+
+WH_PREFIX = "https://www.whitehouse.gov"
+WHITEHOUSE_EO_URL = WH_PREFIX + "/presidential-actions/executive-orders/"
+WHITEHOUSE_PR_URL = WH_PREFIX + "/presidential-actions/proclamations/"
+
+# Listas monitoreadas: (URL, tipo, slug de categoría en WordPress).
+# Única fuente para el fetch y el estado.
+WHITEHOUSE_LISTS = (
+    (WHITEHOUSE_EO_URL, "Executive Order", "executive-orders"),
+    (WHITEHOUSE_PR_URL, "Proclamation", "proclamations"),
+)
+_LISTS_BY_URL = {url: (tipo, slug) for url, tipo, slug in WHITEHOUSE_LISTS}
+
+# API REST de WordPress del sitio
+WH_API = WH_PREFIX + "/wp-json/wp/v2/posts"
+WH_API_CATEGORIES = WH_PREFIX + "/wp-json/wp/v2/categories"
+
+# Número de EO/Proclamation en el título (compilado una sola vez)
+_EO_NUM_RE = re.compile(
+    r"\b(?:Executive Order\s*No\.?|EO|Proclamation(?:\s*No\.?)?)\s*([0-9\-]+)\b",
+    re.IGNORECASE,
+)
+
+# Tope de bytes a leer de cada lista (2 MiB)
+MAX_BODY_BYTES = 2 * 1024 * 1024
+
+# Escapar HTML en los títulos (solo para destinos que lo interpretan;
+# Slack/Discord usan Markdown)
+HTML_ESCAPE = os.getenv("HTML_ESCAPE", "0") == "1"
+
+# Encabezado de las alertas, precalculado por tipo
+_ALERT_HEADER = "🚨 Nueva {} detectada"
+_ALERT_HEADERS = {
+    tipo: _ALERT_HEADER.format(tipo)
+    for tipo in ("Executive Order", "Proclamation", "Acción presidencial")
+}
+
+# Límite de caracteres por mensaje del webhook (Discord: 2000)
+WEBHOOK_MAX_CHARS = 2000
+
+# Bloque de cada publicación; solo se construye el DOM de estos subárboles
+_POST_CLASS = "wp-block-whitehouse-post-template__content"
+# El strainer compara el atributo `class` completo: buscar la clase como
+# palabra para no perder divs con clases extra
+_POST_STRAINER = SoupStrainer(
+    "div", class_=re.compile(r"(?:^|\s)%s(?:\s|$)" % re.escape(_POST_CLASS))
+)
 
 SESSION = requests.Session()
 SESSION.headers.update({
-    "User-Agent": "EO-Watcher/1.0 (+contact: you@example.com)"
+    "User-Agent": "EO-Watcher/1.0 (+contact: you@example.com)",
+    "Accept-Encoding": "gzip, deflate",
 })
+# Pool compartido para las descargas en paralelo, con reintentos con backoff
+# ante errores transitorios (429/5xx). Los webhooks van por aiohttp y solo
+# reutilizan los parámetros de _RETRY
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(["GET"]),
+    # Retry-After sin tope podría colgar la corrida más allá del cron; usar backoff
+    respect_retry_after_header=False,
+    raise_on_status=False,  # devolver la última respuesta; raise_for_status decide
+)
+_ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=_RETRY)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
 
 def load_state(path: str) -> Dict:
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except Exception:
-                return {}
-    return {}
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    except (FileNotFoundError, ValueError):
+        return {}  # primera corrida o estado corrupto
 
 def save_state(path: str, data: Dict):
     tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if orjson:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())  # durable antes del rename
     os.replace(tmp, path)
 
-def fetch_whitehouse_list(URL, max_items: int = 20) -> List[Dict]:
+def fetch_whitehouse_list(
+    URL,
+    max_items: int = 20,
+    stop_at_url: Optional[str] = None,
+    state: Optional[Dict] = None,
+) -> Optional[List[Dict]]:
     """
     Devuelve una lista de Executive Orders o Proclamations con:
     { 'title', 'date', 'url', 'eo_number', 'tipo' }
-    Basado en las categorías actuales del sitio de la Casa Blanca.
+    Usa la API REST de WordPress y, si no responde como se espera,
+    scrapea el HTML de la lista.
+    Devuelve None si no hay nada nuevo (304, o la primera entrada ya es
+    `stop_at_url`) y [] si la página no trajo ninguna entrada válida.
     """
-    out = []
-    r = SESSION.get(URL, timeout=30)
+    items = _fetch_whitehouse_api(URL, max_items, stop_at_url, state)
+    if items is not None:
+        return items or None  # API usable: vacío = cortó en la primera entrada
+    return _fetch_whitehouse_html(URL, max_items, stop_at_url, state)
+
+def _api_category_id(slug: str, cache: Dict) -> Optional[int]:
+    """Resuelve (y cachea en el estado) el id de categoría de la lista."""
+    if cache.get("category_id"):
+        return cache["category_id"]
+    r = SESSION.get(
+        WH_API_CATEGORIES,
+        params={"slug": slug, "_fields": "id"},
+        timeout=30,
+    )
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    found = r.json()
+    if not isinstance(found, list):
+        raise ValueError("respuesta inesperada de /categories")
+    if not found:
+        return None
+    cache["category_id"] = found[0]["id"]
+    return cache["category_id"]
+
+def _fetch_whitehouse_api(
+    URL,
+    max_items: int = 20,
+    stop_at_url: Optional[str] = None,
+    state: Optional[Dict] = None,
+) -> Optional[List[Dict]]:
+    """
+    Versión JSON de la lista vía /wp-json/wp/v2/posts, sin parsear HTML.
+    Devuelve None si hay que caer al scraping de HTML. Si la API no sirve
+    para esta lista (categoría inexistente o sin entradas), lo anota en el
+    estado y no se vuelve a intentar; los errores HTTP solo afectan esta corrida.
+    """
+    entry = _LISTS_BY_URL.get(URL)
+    cache = state.setdefault(URL, {}) if state is not None else {}
+    if entry is None or cache.get("api_unusable"):
+        return None
+    tipo, slug = entry
+
+    try:
+        category_id = _api_category_id(slug, cache)
+        posts = None
+        if category_id is not None:
+            params = {
+                "categories": category_id,
+                "per_page": max(1, min(max_items, 100)),  # WP rechaza > 100
+                "_fields": "title,date,link",
+            }
+            r = SESSION.get(WH_API, params=params, timeout=30)
+            r.raise_for_status()
+            posts = r.json()
+    except (requests.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
+        print(f"[warn] API de WordPress no disponible ({e}); usando HTML.", file=sys.stderr)
+        return None
+
+    if category_id is None or posts == []:
+        # La API no expone estas entradas: no volver a probar
+        cache["api_unusable"] = True
+        print(f"[warn] La API de WordPress no lista '{slug}'; se usará HTML.", file=sys.stderr)
+        return None
+    if not isinstance(posts, list):
+        print("[warn] Respuesta inesperada de la API de WordPress; usando HTML.", file=sys.stderr)
+        return None
+
+    out = []
+    search_num = _EO_NUM_RE.search
+    for p in posts:
+        if not isinstance(p, dict):
+            continue
+        href = p.get("link", "")
+        if stop_at_url and href == stop_at_url:
+            break  # lo siguiente ya se procesó en corridas anteriores
+        title = html.unescape((p.get("title") or {}).get("rendered", "")).strip()
+        m = search_num(title)
+        out.append({
+            "title": title,
+            "date": p.get("date", ""),
+            "url": href,
+            "eo_number": m.group(1) if m else None,
+            "tipo": tipo
+        })
+
+    return out
+
+def _fetch_whitehouse_html(
+    URL,
+    max_items: int = 20,
+    stop_at_url: Optional[str] = None,
+    state: Optional[Dict] = None,
+) -> Optional[List[Dict]]:
+    """
+    Scrapea la lista HTML; basado en las categorías actuales del sitio.
+    Si se pasa `state`, usa ETag/Last-Modified guardados para hacer un GET
+    condicional; un 304 devuelve None sin descargar ni parsear el HTML.
+    Si se pasa `stop_at_url`, deja de leer al llegar a esa URL (ya vista);
+    si es la primera entrada, devuelve None.
+    """
+    out = []
+    cache = state.get(URL, {}) if state is not None else {}
+    headers = {}
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+
+    with SESSION.get(URL, headers=headers, timeout=30, stream=True) as r:
+        if r.status_code == 304:
+            return None  # sin cambios desde la última vez
+        r.raise_for_status()
+
+        # Leer por bloques con un tope, por si la página crece demasiado
+        buf = bytearray()
+        truncated = False
+        for chunk in r.iter_content(chunk_size=64 * 1024):
+            buf.extend(chunk)
+            if len(buf) > MAX_BODY_BYTES:
+                truncated = True
+                break
+
+        # Con el cuerpo truncado no guardamos validadores: un 304 luego
+        # ocultaría lo que no llegamos a leer
+        if state is not None and not truncated:
+            state.setdefault(URL, {}).update({
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+            })
+
+    # bytes: lxml detecta el charset; parse_only descarta nav, footer, scripts...
+    soup = BeautifulSoup(bytes(buf), "lxml", parse_only=_POST_STRAINER)
 
     # Seleccionar cada publicación
-    posts = soup.select("div.wp-block-whitehouse-post-template__content")
+    posts = soup.find_all("div", class_=_POST_CLASS)
+    if not posts:
+        print(f"[warn] Sin bloques de publicación en {URL} (¿cambió el DOM?).", file=sys.stderr)
+        return out
+    search_num = _EO_NUM_RE.search  # local: evita LOAD_GLOBAL por tarjeta
 
     for post in posts:
         # Título y enlace principal
         a = post.select_one(".wp-block-post-title a[href]")
         if not a:
             continue
-        title = a.get_text(strip=True)
         href = a["href"]
         if href.startswith("/"):
-            href = "https://www.whitehouse.gov" + href
+            href = WH_PREFIX + href
+        if stop_at_url and href == stop_at_url:
+            if not out:
+                return None  # la más reciente ya se vio: nada nuevo
+            break  # lo siguiente ya se procesó en corridas anteriores
+        title = a.get_text(strip=True)
 
         # Fecha si existe
         t = post.select_one("time")
@@ -95,11 +314,7 @@ def fetch_whitehouse_list(URL, max_items: int = 20) -> List[Dict]:
             continue  # no es EO ni Proclamation
 
         # Intentar extraer número de EO/Proclamation del título (opcional)
-        m = re.search(
-            r"\b(?:Executive Order\s*No\.?|EO|Proclamation(?:\s*No\.?)?)\s*([0-9\-]+)\b",
-            title,
-            flags=re.IGNORECASE
-        )
+        m = search_num(title)
         eo_number = m.group(1) if m else None
 
         out.append({
@@ -115,30 +330,93 @@ def fetch_whitehouse_list(URL, max_items: int = 20) -> List[Dict]:
 
     return out
 
-def notify(msg: str):
-    print(msg)
-    sys.stdout.flush()
-    hook = os.getenv("WEBHOOK_URL", "").strip()
-    if hook:
+def _chunk_messages(messages: List[str], limit: int = WEBHOOK_MAX_CHARS) -> List[str]:
+    """Agrupa mensajes en el menor número de bloques de hasta `limit` caracteres."""
+    chunks: List[str] = []
+    current = ""
+    for msg in messages:
+        candidate = f"{current}\n\n{msg}" if current else msg
+        if current and len(candidate) > limit:
+            chunks.append(current)
+            current = msg
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _webhook_urls() -> List[str]:
+    """Destinos de WEBHOOK_URLS (coma) más WEBHOOK_URL, sin duplicados."""
+    raw = os.getenv("WEBHOOK_URLS", "").split(",") + [os.getenv("WEBHOOK_URL", "")]
+    urls = [u.strip() for u in raw if u.strip()]
+    return list(dict.fromkeys(urls))
+
+def _retry_after(value: Optional[str], attempt: int) -> float:
+    """Espera antes del siguiente intento: Retry-After (segundos) o backoff."""
+    try:
+        return min(max(0.0, float(value)), 60.0)  # no colgar la corrida del cron
+    except (TypeError, ValueError):
+        return _RETRY.backoff_factor * (2 ** attempt)
+
+async def _post(session, url: str, payload: Dict):
+    """POST a un destino con reintentos y backoff ante 429/5xx o errores de red."""
+    import aiohttp
+
+    for attempt in range(_RETRY.total + 1):
+        retry_after = None
         try:
-            SESSION.post(hook, json={"content": msg}, timeout=20)
-        except Exception as e:
-            print(f"[warn] Webhook error: {e}", file=sys.stderr)
+            async with session.post(url, json=payload) as r:
+                if 200 <= r.status < 300:
+                    return
+                if r.status not in _RETRY.status_forcelist:
+                    body = (await r.text(errors="replace"))[:200]
+                    print(f"[warn] Webhook error ({url}): HTTP {r.status} {body}", file=sys.stderr)
+                    return
+                err = f"HTTP {r.status}"
+                if r.status == 429:
+                    retry_after = r.headers.get("Retry-After")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            err = e
+        if attempt < _RETRY.total:
+            await asyncio.sleep(_retry_after(retry_after, attempt))
+    print(f"[warn] Webhook error ({url}): {err}", file=sys.stderr)
+
+async def _post_chunks(session, url: str, chunks: List[str]):
+    # En orden dentro de cada destino
+    for content in chunks:
+        await _post(session, url, {"content": content})
+
+async def notify_all(chunks: List[str], urls: List[str]):
+    """Envía los bloques a todos los destinos en paralelo."""
+    import aiohttp  # diferido: solo se paga si hay webhooks que notificar
+
+    timeout = aiohttp.ClientTimeout(total=20)
+    headers = {"User-Agent": SESSION.headers["User-Agent"]}
+    async with aiohttp.ClientSession(timeout=timeout, headers=headers) as s:
+        await asyncio.gather(*(_post_chunks(s, u, chunks) for u in urls))
+
+def notify_batch(messages: List[str]):
+    for msg in messages:
+        print(msg)
+    sys.stdout.flush()
+    urls = _webhook_urls()
+    if urls:
+        asyncio.run(notify_all(_chunk_messages(messages), urls))
 
 def format_alert(item: Dict) -> str:
-    parts = []
     tipo = item.get("tipo", "Acción presidencial")
-    parts.append(f"🚨 Nueva {tipo} detectada")
-    title = html.escape(item.get("title", ""))
-    date = item.get("date", "")
-    url = item.get("url", "")
+    header = _ALERT_HEADERS.get(tipo) or _ALERT_HEADER.format(tipo)
+    title = item.get("title", "")
+    if HTML_ESCAPE:
+        title = html.escape(title)
     eo = item.get("eo_number") or "s/n"
-
-    parts.append(f"• *Título:* {title}")
-    parts.append(f"• *Fecha (WH):* {date}")
-    parts.append(f"• *Número:* {eo}")
-    parts.append(f"• *Enlace:* {url}")
-    return "\n".join(parts)
+    return (
+        f"{header}\n"
+        f"• *Título:* {title}\n"
+        f"• *Fecha (WH):* {item.get('date', '')}\n"
+        f"• *Número:* {eo}\n"
+        f"• *Enlace:* {item.get('url', '')}"
+    )
 
 def main():
     state_path = os.getenv("STATE_PATH", os.path.expanduser("~/eo_state.json"))
@@ -146,44 +424,61 @@ def main():
     fr_check = os.getenv("FR_CHECK", "1") == "1"
 
     state = load_state(state_path)
+    original_state = copy.deepcopy(state)  # para no reescribir si nada cambió
 
-    items = fetch_whitehouse_list(URL=WHITEHOUSE_EO_URL, max_items=max_items)
-    items += fetch_whitehouse_list(URL=WHITEHOUSE_PR_URL, max_items=max_items)
+    # Descargar EO y Proclamations en paralelo (I/O puro)
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futures = [
+            ex.submit(fetch_whitehouse_list, u, max_items, state.get(tipo_key, ""), state)
+            for u, tipo_key, _ in WHITEHOUSE_LISTS
+        ]
+        results = [f.result() for f in futures]
+
+    # None = nada nuevo en esa lista; [] = la lista no trajo items
+    if all(res is None for res in results):
+        print("[ok] Sin novedades.")
+        if state != original_state:
+            save_state(state_path, state)  # conservar ETag/Last-Modified
+        return
+    items = [it for res in results if res for it in res]
 
     if not items:
         print("[info] No se encontraron items en la lista (DOM pudo cambiar).")
+        if state != original_state:
+            save_state(state_path, state)  # conservar ETag/Last-Modified
         return
     
-    # Filtrar nuevos por tipo y mantener orden
+    # Filtrar nuevos por tipo en una sola pasada, manteniendo el orden
+    last_seen = {tipo_key: state.get(tipo_key, "") for _, tipo_key, _ in WHITEHOUSE_LISTS}
+    stopped = {tipo_key: False for tipo_key in last_seen}
+    newest: Dict[str, str] = {}  # URL más reciente por tipo
     new_items: List[Dict] = []
-    for tipo_key in ["Executive Order", "Proclamation"]:
-        last_seen = state.get(tipo_key, "")
-        tipo_items = [it for it in items if it["tipo"] == tipo_key]
-        
-        for it in tipo_items:
-            if it["url"] == last_seen:
-                break  # Detener solo para este tipo
-            new_items.append(it)
-
+    for it in items:
+        t = it["tipo"]
+        if stopped.get(t):
+            continue
+        if it["url"] == last_seen.get(t, ""):
+            stopped[t] = True  # Detener solo para este tipo
+            continue
+        new_items.append(it)
+        newest.setdefault(t, it["url"])
 
     if not new_items:
         print("[ok] Sin novedades.")
+        if state != original_state:
+            save_state(state_path, state)  # conservar ETag/Last-Modified
         return
 
-    # Procesar en orden cronológico (del viejo al más nuevo)
-    for it in reversed(new_items):
-        msg = format_alert(it)
-        notify(msg)
-        time.sleep(1)  # pequeña pausa por si hay varios
-
-    # Guardar último visto por tipo
-    for tipo_key in ["Executive Order", "Proclamation"]:
-        tipo_new_items = [it for it in new_items if it["tipo"] == tipo_key]
-        if tipo_new_items:
-            state[tipo_key] = tipo_new_items[-1]["url"]  # el más reciente de este tipo
+    # Procesar en orden cronológico (del viejo al más nuevo), en un solo envío
+    msgs = [format_alert(it) for it in reversed(new_items)]
+    notify_batch(msgs)
 
+    # Guardar último visto por tipo (el más reciente de cada uno)
+    for tipo_key, url in newest.items():
+        state[tipo_key] = url
 
-    save_state(state_path, state)
+    if state != original_state:
+        save_state(state_path, state)
     print("[done] Estado actualizado.")
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import EXECUTIVEORDERS as eo
+
+LIST_HTML = b"""
+<html><body>
+<nav>menu</nav>
+<div class="wp-block-whitehouse-post-template__content {extra}">
+  <h2 class="wp-block-post-title"><a href="/presidential-actions/2025/01/eo-1/">Executive Order No. 14001</a></h2>
+  <time datetime="2025-01-20">January 20, 2025</time>
+  <div class="taxonomy-category"><a>Executive Orders</a></div>
+</div>
+</body></html>
+"""
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.status_code = 200
+        self.headers = {}
+        self._body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        yield self._body
+
+
+def _fetch(monkeypatch, extra_class: str):
+    body = LIST_HTML.replace(b"{extra}", extra_class.encode())
+    monkeypatch.setattr(eo.SESSION, "get", lambda *a, **k: FakeResponse(body))
+    return eo._fetch_whitehouse_html(eo.WHITEHOUSE_EO_URL)
+
+
+def test_html_single_class_post(monkeypatch):
+    items = _fetch(monkeypatch, "")
+    assert [it["url"] for it in items] == [
+        eo.WH_PREFIX + "/presidential-actions/2025/01/eo-1/"
+    ]
+
+
+def test_html_multi_class_post(monkeypatch):
+    items = _fetch(monkeypatch, "is-layout-flow extra")
+    assert len(items) == 1
+    assert items[0]["tipo"] == "Executive Order"
+    assert items[0]["eo_number"] == "14001"
+
+
+class FakeJSONResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self._data = data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise eo.requests.HTTPError(f"HTTP {self.status_code}", response=self)
+
+    def json(self):
+        return self._data
+
+
+def test_api_per_page_is_clamped(monkeypatch):
+    sent = {}
+
+    def fake_get(url, params=None, **kwargs):
+        if url == eo.WH_API_CATEGORIES:
+            return FakeJSONResponse([{"id": 7}])
+        sent.update(params)
+        return FakeJSONResponse([{"link": "a", "title": {"rendered": "t"}, "date": ""}])
+
+    monkeypatch.setattr(eo.SESSION, "get", fake_get)
+    eo._fetch_whitehouse_api(eo.WHITEHOUSE_EO_URL, max_items=150, state={})
+    assert sent["per_page"] == 100
+
+
+def test_api_http_error_does_not_disable_api(monkeypatch):
+    monkeypatch.setattr(eo.SESSION, "get", lambda *a, **k: FakeJSONResponse({}, 403))
+    state = {}
+    assert eo._fetch_whitehouse_api(eo.WHITEHOUSE_EO_URL, state=state) is None
+    assert not state[eo.WHITEHOUSE_EO_URL].get("api_unusable")